@@ -1,251 +1,231 @@
 import sqlite3
-from datetime import datetime
+import threading
+import queue
+import time
+from datetime import datetime, timezone
 import os
 
 DATABASE_NAME = 'fire_detection.db'
+LOG_BATCH_SIZE = 100  # Insert detection logs in transactions of up to this many rows...
+LOG_FLUSH_INTERVAL = 0.5  # ...or whatever arrived within this many seconds
+
+# One shared connection for the whole app; _lock serializes access to it
+_conn = None
+_lock = threading.Lock()
+
+# Detection logs waiting for the writer thread
+log_queue = queue.Queue()
+_FLUSH = object()  # Queued by flush_logs to make the writer commit without waiting
+
+def _connect():
+    """Open the shared connection in WAL mode"""
+    conn = sqlite3.connect(DATABASE_NAME, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row  # Rows convert straight to JSON-ready dicts
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
+def _log_writer():
+    """Drain log_queue, inserting each batch of rows in a single transaction"""
+    while True:
+        batch = []
+        item = log_queue.get()
+        taken = 1
+        deadline = time.time() + LOG_FLUSH_INTERVAL
+        while item is not _FLUSH:
+            batch.append(item)
+            if len(batch) >= LOG_BATCH_SIZE:
+                break
+            try:
+                item = log_queue.get(timeout=max(deadline - time.time(), 0))
+                taken += 1
+            except queue.Empty:
+                break
+
+        try:
+            if batch:
+                with _lock:
+                    _conn.executemany('''
+                        INSERT INTO detection_logs (session_id, timestamp, fire_count, smoke_count, alert_triggered)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', batch)
+                    _conn.commit()
+        except Exception as e:
+            print(f"Error writing detection logs: {e}")
+        finally:
+            for _ in range(taken):
+                log_queue.task_done()
+
+def flush_logs():
+    """Block until every queued detection log has been written"""
+    log_queue.put(_FLUSH)
+    log_queue.join()
 
 def init_db():
     """Initialize the database and create tables if they don't exist"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    # Create detections table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS detections (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            detection_type TEXT NOT NULL,
-            count INTEGER NOT NULL,
-            confidence REAL,
-            image_path TEXT
-        )
-    ''')
-    
-    # Create detection_sessions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS detection_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            start_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-            end_time DATETIME,
-            total_fire_detections INTEGER DEFAULT 0,
-            total_smoke_detections INTEGER DEFAULT 0,
-            status TEXT DEFAULT 'active'
-        )
-    ''')
-    
-    # Create detection_logs table for detailed logs
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS detection_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id INTEGER,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            fire_count INTEGER DEFAULT 0,
-            smoke_count INTEGER DEFAULT 0,
-            alert_triggered BOOLEAN DEFAULT 0,
-            FOREIGN KEY (session_id) REFERENCES detection_sessions(id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    global _conn
+    if _conn is None:
+        _conn = _connect()
+        threading.Thread(target=_log_writer, daemon=True).start()
+
+    with _lock:
+        # Create detections table
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS detections (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                detection_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                confidence REAL,
+                image_path TEXT
+            )
+        ''')
+
+        # Create detection_sessions table
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS detection_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+                end_time DATETIME,
+                total_fire_detections INTEGER DEFAULT 0,
+                total_smoke_detections INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'active'
+            )
+        ''')
+
+        # Create detection_logs table for detailed logs
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS detection_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                fire_count INTEGER DEFAULT 0,
+                smoke_count INTEGER DEFAULT 0,
+                alert_triggered BOOLEAN DEFAULT 0,
+                FOREIGN KEY (session_id) REFERENCES detection_sessions(id)
+            )
+        ''')
+
+        # Indexes for the per-session and date-range lookups used by the reports
+        _conn.execute('CREATE INDEX IF NOT EXISTS idx_logs_session ON detection_logs(session_id, timestamp)')
+        _conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_start ON detection_sessions(start_time)')
+        _conn.execute('CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections(timestamp)')
+
+        _conn.commit()
     print("Database initialized successfully!")
 
 def add_detection(detection_type, count, confidence=None, image_path=None):
     """Add a new detection record"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO detections (detection_type, count, confidence, image_path)
-        VALUES (?, ?, ?, ?)
-    ''', (detection_type, count, confidence, image_path))
-    
-    conn.commit()
-    detection_id = cursor.lastrowid
-    conn.close()
-    return detection_id
+    with _lock:
+        cursor = _conn.execute('''
+            INSERT INTO detections (detection_type, count, confidence, image_path)
+            VALUES (?, ?, ?, ?)
+        ''', (detection_type, count, confidence, image_path))
+
+        _conn.commit()
+        return cursor.lastrowid
 
 def start_session():
     """Start a new detection session"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO detection_sessions (start_time, status)
-        VALUES (?, 'active')
-    ''', (datetime.now(),))
-    
-    conn.commit()
-    session_id = cursor.lastrowid
-    conn.close()
-    return session_id
+    with _lock:
+        cursor = _conn.execute('''
+            INSERT INTO detection_sessions (start_time, status)
+            VALUES (?, 'active')
+        ''', (datetime.now(),))
+
+        _conn.commit()
+        return cursor.lastrowid
 
 def end_session(session_id):
     """End a detection session"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    # Calculate total detections for this session
-    cursor.execute('''
-        SELECT 
-            SUM(fire_count) as total_fire,
-            SUM(smoke_count) as total_smoke
-        FROM detection_logs
-        WHERE session_id = ?
-    ''', (session_id,))
-    
-    result = cursor.fetchone()
-    total_fire = result[0] or 0
-    total_smoke = result[1] or 0
-    
-    # Update session
-    cursor.execute('''
-        UPDATE detection_sessions
-        SET end_time = ?,
-            total_fire_detections = ?,
-            total_smoke_detections = ?,
-            status = 'completed'
-        WHERE id = ?
-    ''', (datetime.now(), total_fire, total_smoke, session_id))
-    
-    conn.commit()
-    conn.close()
+    # Make sure this session's queued logs are counted
+    flush_logs()
+
+    with _lock:
+        # Total this session's detections and close it in one statement
+        _conn.execute('''
+            UPDATE detection_sessions
+            SET end_time = ?,
+                total_fire_detections = (
+                    SELECT COALESCE(SUM(fire_count), 0) FROM detection_logs WHERE session_id = ?
+                ),
+                total_smoke_detections = (
+                    SELECT COALESCE(SUM(smoke_count), 0) FROM detection_logs WHERE session_id = ?
+                ),
+                status = 'completed'
+            WHERE id = ?
+        ''', (datetime.now(), session_id, session_id, session_id))
+
+        _conn.commit()
 
 def add_detection_log(session_id, fire_count, smoke_count, alert_triggered=False):
-    """Add a detection log entry"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO detection_logs (session_id, fire_count, smoke_count, alert_triggered)
-        VALUES (?, ?, ?, ?)
-    ''', (session_id, fire_count, smoke_count, alert_triggered))
-    
-    conn.commit()
-    conn.close()
+    """Queue a detection log entry; the writer thread inserts it in the background"""
+    # Stamp it now so the row records when it was detected, not when it was written.
+    # Same UTC format as the column's CURRENT_TIMESTAMP default used by older rows
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    log_queue.put_nowait((session_id, timestamp, fire_count, smoke_count, alert_triggered))
 
 def get_all_detections(limit=100):
     """Get all detection records"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, timestamp, detection_type, count, confidence
-        FROM detections
-        ORDER BY timestamp DESC
-        LIMIT ?
-    ''', (limit,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'id': row[0],
-            'timestamp': row[1],
-            'type': row[2],
-            'count': row[3],
-            'confidence': row[4]
-        }
-        for row in results
-    ]
+    with _lock:
+        results = _conn.execute('''
+            SELECT id, timestamp, detection_type AS type, count, confidence
+            FROM detections
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+
+    return [dict(row) for row in results]
 
 def get_sessions(limit=50):
     """Get all detection sessions"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, start_time, end_time, total_fire_detections, 
-               total_smoke_detections, status
-        FROM detection_sessions
-        ORDER BY start_time DESC
-        LIMIT ?
-    ''', (limit,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'id': row[0],
-            'start_time': row[1],
-            'end_time': row[2],
-            'total_fire': row[3],
-            'total_smoke': row[4],
-            'status': row[5]
-        }
-        for row in results
-    ]
+    with _lock:
+        results = _conn.execute('''
+            SELECT id, start_time, end_time, total_fire_detections AS total_fire,
+                   total_smoke_detections AS total_smoke, status
+            FROM detection_sessions
+            ORDER BY start_time DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+
+    return [dict(row) for row in results]
 
 def get_session_logs(session_id):
     """Get all logs for a specific session"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, timestamp, fire_count, smoke_count, alert_triggered
-        FROM detection_logs
-        WHERE session_id = ?
-        ORDER BY timestamp ASC
-    ''', (session_id,))
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'id': row[0],
-            'timestamp': row[1],
-            'fire_count': row[2],
-            'smoke_count': row[3],
-            'alert_triggered': row[4]
-        }
-        for row in results
-    ]
+    with _lock:
+        results = _conn.execute('''
+            SELECT id, timestamp, fire_count, smoke_count, alert_triggered
+            FROM detection_logs
+            WHERE session_id = ?
+            ORDER BY timestamp ASC
+        ''', (session_id,)).fetchall()
+
+    return [dict(row) for row in results]
 
 def get_statistics():
     """Get overall statistics"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    # Total sessions
-    cursor.execute('SELECT COUNT(*) FROM detection_sessions')
-    total_sessions = cursor.fetchone()[0]
-    
-    # Total detections
-    cursor.execute('''
-        SELECT 
-            SUM(total_fire_detections) as total_fire,
-            SUM(total_smoke_detections) as total_smoke
-        FROM detection_sessions
-    ''')
-    result = cursor.fetchone()
-    total_fire = result[0] or 0
-    total_smoke = result[1] or 0
-    
-    # Recent activity (last 24 hours)
-    cursor.execute('''
-        SELECT COUNT(*) 
-        FROM detection_sessions
-        WHERE start_time >= datetime('now', '-1 day')
-    ''')
-    recent_sessions = cursor.fetchone()[0]
-    
-    # Average detections per session
-    cursor.execute('''
-        SELECT 
-            AVG(total_fire_detections) as avg_fire,
-            AVG(total_smoke_detections) as avg_smoke
-        FROM detection_sessions
-        WHERE status = 'completed'
-    ''')
-    result = cursor.fetchone()
-    avg_fire = round(result[0] or 0, 2)
-    avg_smoke = round(result[1] or 0, 2)
-    
-    conn.close()
-    
+    with _lock:
+        # Totals, last-24h activity and per-session averages in a single pass
+        result = _conn.execute('''
+            SELECT
+                COUNT(*) as total_sessions,
+                SUM(total_fire_detections) as total_fire,
+                SUM(total_smoke_detections) as total_smoke,
+                COUNT(CASE WHEN start_time >= datetime('now', '-1 day') THEN 1 END) as recent_sessions,
+                AVG(CASE WHEN status = 'completed' THEN total_fire_detections END) as avg_fire,
+                AVG(CASE WHEN status = 'completed' THEN total_smoke_detections END) as avg_smoke
+            FROM detection_sessions
+        ''').fetchone()
+
+    total_sessions = result['total_sessions']
+    total_fire = result['total_fire'] or 0
+    total_smoke = result['total_smoke'] or 0
+    recent_sessions = result['recent_sessions']
+    avg_fire = round(result['avg_fire'] or 0, 2)
+    avg_smoke = round(result['avg_smoke'] or 0, 2)
+
     return {
         'total_sessions': total_sessions,
         'total_fire_detections': total_fire,
@@ -257,71 +237,53 @@ def get_statistics():
 
 def get_detections_by_date(start_date=None, end_date=None):
     """Get detections within a date range"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    if start_date and end_date:
-        cursor.execute('''
-            SELECT id, start_time, end_time, total_fire_detections, 
-                   total_smoke_detections, status
-            FROM detection_sessions
-            WHERE start_time BETWEEN ? AND ?
-            ORDER BY start_time DESC
-        ''', (start_date, end_date))
-    else:
-        cursor.execute('''
-            SELECT id, start_time, end_time, total_fire_detections, 
-                   total_smoke_detections, status
-            FROM detection_sessions
-            ORDER BY start_time DESC
-            LIMIT 100
-        ''')
-    
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'id': row[0],
-            'start_time': row[1],
-            'end_time': row[2],
-            'total_fire': row[3],
-            'total_smoke': row[4],
-            'status': row[5]
-        }
-        for row in results
-    ]
+    with _lock:
+        if start_date and end_date:
+            cursor = _conn.execute('''
+                SELECT id, start_time, end_time, total_fire_detections AS total_fire,
+                       total_smoke_detections AS total_smoke, status
+                FROM detection_sessions
+                WHERE start_time BETWEEN ? AND ?
+                ORDER BY start_time DESC
+            ''', (start_date, end_date))
+        else:
+            cursor = _conn.execute('''
+                SELECT id, start_time, end_time, total_fire_detections AS total_fire,
+                       total_smoke_detections AS total_smoke, status
+                FROM detection_sessions
+                ORDER BY start_time DESC
+                LIMIT 100
+            ''')
+
+        results = cursor.fetchall()
+
+    return [dict(row) for row in results]
 
 def delete_old_records(days=30):
     """Delete records older than specified days"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        DELETE FROM detection_logs
-        WHERE session_id IN (
-            SELECT id FROM detection_sessions
+    with _lock:
+        _conn.execute('''
+            DELETE FROM detection_logs
+            WHERE session_id IN (
+                SELECT id FROM detection_sessions
+                WHERE start_time < datetime('now', '-' || ? || ' days')
+            )
+        ''', (days,))
+
+        _conn.execute('''
+            DELETE FROM detection_sessions
             WHERE start_time < datetime('now', '-' || ? || ' days')
-        )
-    ''', (days,))
-    
-    cursor.execute('''
-        DELETE FROM detection_sessions
-        WHERE start_time < datetime('now', '-' || ? || ' days')
-    ''', (days,))
-    
-    cursor.execute('''
-        DELETE FROM detections
-        WHERE timestamp < datetime('now', '-' || ? || ' days')
-    ''', (days,))
-    
-    conn.commit()
-    deleted_count = cursor.rowcount
-    conn.close()
-    
-    return deleted_count
+        ''', (days,))
+
+        cursor = _conn.execute('''
+            DELETE FROM detections
+            WHERE timestamp < datetime('now', '-' || ? || ' days')
+        ''', (days,))
+
+        _conn.commit()
+        return cursor.rowcount
 
 if __name__ == '__main__':
     # Initialize database when running this file directly
     init_db()
-    print("Database tables created successfully!")
\ No newline at end of file
+    print("Database tables created successfully!")
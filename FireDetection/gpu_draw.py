@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+from numba import cuda
+
+FONT = cv2.FONT_HERSHEY_DUPLEX
+FONT_SCALE = 0.8
+FONT_THICKNESS = 2
+BOX_THICKNESS = 3
+GLYPHS = "abcdefghijklmnopqrstuvwxyz0123456789.- "
+THREADS = (16, 16)
+
+def _build_atlas():
+    """Render every glyph once with OpenCV into a (n_glyphs, h, w) mask"""
+    sizes = [cv2.getTextSize(ch, FONT, FONT_SCALE, FONT_THICKNESS) for ch in GLYPHS]
+    text_h = max(h for (_, h), _ in sizes)
+    baseline = max(base for _, base in sizes)
+    cell_w = max(w for (w, _), _ in sizes) + FONT_THICKNESS
+    cell_h = text_h + baseline + FONT_THICKNESS
+
+    atlas = np.zeros((len(GLYPHS), cell_h, cell_w), dtype=np.uint8)
+    advances = np.zeros(len(GLYPHS), dtype=np.int32)
+    for i, ch in enumerate(GLYPHS):
+        cell = np.zeros((cell_h, cell_w), dtype=np.uint8)
+        cv2.putText(cell, ch, (0, text_h), FONT, FONT_SCALE, 255, FONT_THICKNESS)
+        atlas[i] = cell
+        advances[i] = sizes[i][0][0]
+
+    return atlas, advances, text_h
+
+_atlas, _advances, TEXT_HEIGHT = _build_atlas()
+_glyph_index = {ch: i for i, ch in enumerate(GLYPHS)}
+_atlas_gpu = None
+
+@cuda.jit
+def _fill_rect(img, x1, y1, x2, y2, c0, c1, c2):
+    """Fill [x1, x2) x [y1, y2) of a (3, H, W) image, clipped to the frame"""
+    tx, ty = cuda.grid(2)
+    y = y1 + ty
+    x = x1 + tx
+    if y < 0 or x < 0 or y >= y2 or x >= x2 or y >= img.shape[1] or x >= img.shape[2]:
+        return
+    img[0, y, x] = c0
+    img[1, y, x] = c1
+    img[2, y, x] = c2
+
+@cuda.jit
+def _draw_glyphs(img, atlas, codes, offsets, x0, y0, c0, c1, c2):
+    """Copy the set pixels of each glyph in codes onto the image"""
+    gx, gy, k = cuda.grid(3)
+    if k >= codes.shape[0] or gy >= atlas.shape[1] or gx >= atlas.shape[2]:
+        return
+    if atlas[codes[k], gy, gx] < 128:
+        return
+    y = y0 + gy
+    x = x0 + offsets[k] + gx
+    if y < 0 or x < 0 or y >= img.shape[1] or x >= img.shape[2]:
+        return
+    img[0, y, x] = c0
+    img[1, y, x] = c1
+    img[2, y, x] = c2
+
+def _blocks(*extent):
+    return tuple((n + t - 1) // t for n, t in zip(extent, THREADS))
+
+def fill_rect(img, x1, y1, x2, y2, color):
+    if x2 <= x1 or y2 <= y1:
+        return
+    _fill_rect[_blocks(x2 - x1, y2 - y1), THREADS](img, x1, y1, x2, y2, *color)
+
+def text_width(label):
+    return int(sum(_advances[_glyph_index.get(ch, _glyph_index[' '])] for ch in label))
+
+def draw_text(img, label, x, y, color):
+    """Draw label with its baseline at (x, y), like cv2.putText"""
+    global _atlas_gpu
+    if _atlas_gpu is None:
+        _atlas_gpu = cuda.to_device(_atlas)
+
+    codes = np.array([_glyph_index.get(ch, _glyph_index[' ']) for ch in label], dtype=np.int32)
+    offsets = np.concatenate(([0], np.cumsum(_advances[codes])[:-1])).astype(np.int32)
+    blocks = _blocks(_atlas.shape[2], _atlas.shape[1]) + (len(codes),)
+    _draw_glyphs[blocks, THREADS + (1,)](img, _atlas_gpu, cuda.to_device(codes),
+                                         cuda.to_device(offsets), x, y - TEXT_HEIGHT, *color)
+
+def check():
+    """Compile and launch both kernels once on a scratch image
+
+    Importing numba doesn't prove @cuda.jit works: compiling needs libNVVM,
+    which torch's CUDA wheels don't ship. Raises if drawing would fail.
+    """
+    if not cuda.is_available():
+        raise RuntimeError("numba cannot access a CUDA device")
+    scratch = cuda.device_array((3, _atlas.shape[1], _atlas.shape[2]), dtype=np.uint8)
+    fill_rect(scratch, 0, 0, 1, 1, (0, 0, 0))
+    draw_text(scratch, "0", 0, TEXT_HEIGHT, (0, 0, 0))
+    cuda.synchronize()
+
+def draw_detection(frame, x1, y1, x2, y2, color, label, text_color=(255, 255, 255)):
+    """GPU equivalent of the cv2.rectangle/putText calls in draw_boxes
+
+    frame is a (3, H, W) uint8 CUDA tensor and is modified in place.
+    Colors are per-plane values, so they work for BGR or YUV frames.
+    """
+    img = cuda.as_cuda_array(frame)
+    half = BOX_THICKNESS // 2
+
+    # Draw bounding box as four strips
+    fill_rect(img, x1 - half, y1 - half, x2 + half + 1, y1 + half + 1, color)
+    fill_rect(img, x1 - half, y2 - half, x2 + half + 1, y2 + half + 1, color)
+    fill_rect(img, x1 - half, y1 - half, x1 + half + 1, y2 + half + 1, color)
+    fill_rect(img, x2 - half, y1 - half, x2 + half + 1, y2 + half + 1, color)
+
+    # Draw label with background
+    fill_rect(img, x1, y1 - TEXT_HEIGHT - 10, x1 + text_width(label), y1, color)
+    draw_text(img, label, x1, y1 - 10, text_color)
@@ -0,0 +1,135 @@
+import os
+import argparse
+import cv2
+import yaml
+import torch
+from ultralytics import YOLO
+
+IMGSZ = 640
+WORKSPACE_GB = 4
+CALIBRATION_DIR = 'calibration'
+CALIBRATION_YAML = 'calib.yaml'
+
+def collect_calibration_frames(source, count=300, every=10, out_dir=CALIBRATION_DIR):
+    """Save frames from the camera so INT8 calibration sees deployment data"""
+    image_dir = os.path.join(out_dir, 'images')
+    os.makedirs(image_dir, exist_ok=True)
+
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open calibration source: {source}")
+
+    saved = 0
+    read = 0
+    while saved < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        read += 1
+
+        # Space the samples out so they cover different lighting/scenes
+        if read % every != 0:
+            continue
+
+        cv2.imwrite(os.path.join(image_dir, f"frame_{saved:04d}.jpg"), frame)
+        saved += 1
+
+    cap.release()
+    print(f"Saved {saved} calibration frames to {image_dir}")
+    return saved
+
+def has_calibration_frames(out_dir=CALIBRATION_DIR):
+    """True if collect_calibration_frames has saved at least one image"""
+    image_dir = os.path.join(out_dir, 'images')
+    return os.path.isdir(image_dir) and any(name.endswith('.jpg') for name in os.listdir(image_dir))
+
+def write_calibration_yaml(names, out_dir=CALIBRATION_DIR, yaml_path=CALIBRATION_YAML):
+    """Write the dataset YAML Ultralytics uses to feed the INT8 calibrator"""
+    dataset = {
+        'path': os.path.abspath(out_dir),
+        'train': 'images',
+        'val': 'images',
+        'names': dict(names)
+    }
+    with open(yaml_path, 'w') as f:
+        yaml.safe_dump(dataset, f)
+    return yaml_path
+
+def export_engine(model_path, int8=False, batch=1):
+    """Export the PyTorch model to a TensorRT engine and return its path"""
+    model = YOLO(model_path)
+
+    # batch=1 builds a fixed 1x3xIMGSZxIMGSZ engine so TensorRT can pick the
+    # best kernel per layer; larger batches need a dynamic batch axis (1..batch)
+    options = {
+        'format': 'engine',
+        'imgsz': IMGSZ,
+        'dynamic': batch > 1,
+        'batch': batch,
+        'workspace': WORKSPACE_GB
+    }
+
+    if int8:
+        # INT8 needs calibration frames captured from the real camera
+        options['int8'] = True
+        options['data'] = write_calibration_yaml(model.names)
+    else:
+        options['half'] = True
+
+    return model.export(**options)
+
+def engine_file(engine_path, batch=1, int8=False):
+    """Engine path tagged with the settings it was built for, e.g. model_b1_fp16.engine
+
+    An engine only accepts the batch shape and precision it was exported
+    with, so each combination gets its own file.
+    """
+    stem, ext = os.path.splitext(engine_path)
+    return f"{stem}_b{batch}_{'int8' if int8 else 'fp16'}{ext or '.engine'}"
+
+def load_model(model_path, engine_path, batch=1):
+    """Load the TensorRT engine, building it on first run if a GPU is present"""
+    # Prefer INT8 when calibration frames exist, falling back to FP16
+    precisions = [True, False] if has_calibration_frames() else [False]
+    engines = [(int8, engine_file(engine_path, batch, int8)) for int8 in precisions]
+
+    built = [path for _, path in engines if os.path.exists(path)]
+    if not built and torch.cuda.is_available():
+        for int8, path in engines:
+            precision = 'INT8' if int8 else 'FP16'
+            try:
+                print(f"Exporting TensorRT engine ({precision}, batch {batch})...")
+                exported = export_engine(model_path, int8=int8, batch=batch)
+                if exported != path:
+                    os.replace(exported, path)
+                built = [path]
+                break
+            except Exception as e:
+                print(f"TensorRT {precision} export failed: {e}")
+
+    if built:
+        print(f"Loaded TensorRT engine: {built[0]}")
+        return YOLO(built[0], task='detect')
+
+    print(f"Loaded PyTorch model: {model_path}")
+    return YOLO(model_path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the TensorRT engine for fire detection')
+    parser.add_argument('--model', default='firedetectionYolo12.pt')
+    parser.add_argument('--engine', default='firedetectionYolo12.engine')
+    parser.add_argument('--calibrate', metavar='SOURCE',
+                        help='RTSP URL or video file to capture INT8 calibration frames from')
+    parser.add_argument('--count', type=int, default=300)
+    parser.add_argument('--batch', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.calibrate:
+        collect_calibration_frames(args.calibrate, count=args.count)
+
+    # Rebuild from scratch for this batch size
+    for int8 in (True, False):
+        path = engine_file(args.engine, args.batch, int8)
+        if os.path.exists(path):
+            os.remove(path)
+    load_model(args.model, args.engine, batch=args.batch)